@@ -7,24 +7,219 @@ from fastapi import (
     WebSocketDisconnect,
 )
 from faster_whisper import WhisperModel
+from faster_whisper.audio import decode_audio
 import numpy as np
 import time
 import asyncio
-import uvicorn
-import shutil
+import concurrent.futures
+import functools
+import io
 import os
-import tempfile
-from pathlib import Path
+from typing import Optional
+import uvicorn
+
+# orjson is much faster than stdlib json for the websocket messages
+try:
+    import orjson
+
+    def json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    import json
+
+    def json_dumps(obj) -> str:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+# Process-wide torch math settings for any torch-based preprocessing
+try:
+    import torch
+
+    torch.set_grad_enabled(False)  # Per-thread, so executor code still uses no_grad()
+    torch.backends.cudnn.benchmark = True
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.set_float32_matmul_precision("high")
+except ImportError:
+    pass
+
+# Optional TensorRT-LLM backend; faster-whisper stays the default
+USE_TRT = os.getenv("USE_TRT") == "1"
+TRT_ENGINE_DIR = os.getenv("TRT_ENGINE_DIR", "/app/models/whisper_trt")
+# Empty means: pick the English prefix matching the engine (multilingual or .en)
+TRT_TEXT_PREFIX = os.getenv("TRT_TEXT_PREFIX", "")
+# Empty means: read n_mels from the engine's encoder config (80, or 128 for large-v3)
+TRT_N_MELS = os.getenv("TRT_N_MELS", "")
+
+# faster-whisper settings; e.g. STT_MODEL=small.en rolls back to the smaller model
+STT_MODEL = os.getenv("STT_MODEL", "distil-large-v3")
+STT_COMPUTE_TYPE = os.getenv("STT_COMPUTE_TYPE", "int8_float16")
+STT_DEVICE = os.getenv("STT_DEVICE", "cuda")
+
+if USE_TRT:
+    from faster_whisper.feature_extractor import FeatureExtractor
+    from tensorrt_llm.runtime import ModelRunnerCpp
+    from tokenizers import Tokenizer
 
 app = FastAPI()
 
-# Load model from the path we will pre-download to
-model = WhisperModel(
-    "small.en",  # Fast and accurate
-    device="cuda",
-    compute_type="float16",
-    download_root="/app/models/whisper",
-)
+
+class TRTWhisper:
+    """Whisper running as prebuilt TensorRT-LLM encoder/decoder engines.
+
+    Engines are built with the TensorRT-LLM whisper example
+    (--use_gpt_attention_plugin --use_gemm_plugin --dtype float16) and
+    stored in TRT_ENGINE_DIR next to the model's tokenizer.json. Audio is
+    decoded greedily in consecutive 30s windows.
+    """
+
+    N_SAMPLES = 30 * 16000
+    N_FRAMES = 3000
+    N_FFT = 400
+    HOP_LENGTH = 160
+
+    # Multilingual checkpoints have >= 51865 tokens, English-only (.en) 51864
+    MULTILINGUAL_VOCAB_SIZE = 51865
+    MULTILINGUAL_PREFIX = "<|startoftranscript|><|en|><|transcribe|><|notimestamps|>"
+    ENGLISH_ONLY_PREFIX = "<|startoftranscript|><|notimestamps|>"
+
+    def __init__(self, engine_dir: str, max_new_tokens: Optional[int] = None):
+        encoder_config = self._read_config(engine_dir, "encoder")
+        decoder_config = self._read_config(engine_dir, "decoder")
+        decoder_model = decoder_config.get("pretrained_config", {})
+        n_mels = int(TRT_N_MELS or encoder_config.get("pretrained_config", {}).get("n_mels", 80))
+        text_prefix = TRT_TEXT_PREFIX or (
+            self.MULTILINGUAL_PREFIX
+            if decoder_model.get("vocab_size", 0) >= self.MULTILINGUAL_VOCAB_SIZE
+            else self.ENGLISH_ONLY_PREFIX
+        )
+
+        # Window and mel filterbank live on the GPU for the whole process
+        self.window = torch.hann_window(self.N_FFT, device="cuda")
+        self.mel_filters = torch.from_numpy(
+            FeatureExtractor.get_mel_filters(16000, self.N_FFT, n_mels=n_mels).astype(np.float32)
+        ).to("cuda")
+        # Pinned host staging buffer so the audio upload is a direct DMA copy.
+        # Reuse is safe: calls are serialized on STT_EXECUTOR and each one
+        # synchronizes before returning.
+        self.pinned = torch.empty(self.N_SAMPLES, dtype=torch.float32, pin_memory=True)
+        self.tokenizer = Tokenizer.from_file(os.path.join(engine_dir, "tokenizer.json"))
+        self.eot_id = self.tokenizer.token_to_id("<|endoftext|>")
+        self.prompt_ids = torch.tensor(
+            self.tokenizer.encode(text_prefix, add_special_tokens=False).ids,
+            dtype=torch.int32,
+        )
+        if max_new_tokens is None:
+            # Whisper's own per-window limit: half the text context (448 // 2 = 224),
+            # but no more than the engine was built to hold after the prompt
+            max_new_tokens = decoder_model.get("max_position_embeddings", 448) // 2
+            max_seq_len = decoder_config.get("build_config", {}).get("max_seq_len")
+            if max_seq_len and max_seq_len - len(self.prompt_ids) < max_new_tokens:
+                max_new_tokens = max_seq_len - len(self.prompt_ids)
+                print(
+                    f"[STT] Warning: decoder engine max_seq_len={max_seq_len} caps each 30s "
+                    f"window at {max_new_tokens} tokens; rebuild with a larger --max_seq_len",
+                    flush=True,
+                )
+        print(f"[STT] TRT engine: n_mels={n_mels}, prefix={text_prefix}, max_new_tokens={max_new_tokens}", flush=True)
+        self.max_new_tokens = max_new_tokens
+        self.runner = ModelRunnerCpp.from_dir(
+            engine_dir=engine_dir,
+            is_enc_dec=True,
+            max_batch_size=1,
+            max_input_len=self.N_FRAMES,
+            max_output_len=max_new_tokens,
+            max_beam_width=1,
+        )
+
+    @staticmethod
+    def _read_config(engine_dir: str, component: str) -> dict:
+        """Return an engine component's config.json, or {} if missing."""
+        import json
+
+        path = os.path.join(engine_dir, component, "config.json")
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def log_mel_spectrogram(self, audio: np.ndarray) -> "torch.Tensor":
+        """Compute Whisper's log-Mel features on the GPU, shape (n_mels, N_FRAMES).
+
+        Only the real samples are copied to the device (via the pinned
+        staging buffer); the 30s zero padding is created there, and STFT
+        plus filterbank run as CUDA kernels. Audio must fit in one window.
+        """
+        n = audio.size
+        self.pinned[:n].copy_(torch.from_numpy(audio[:n]))
+        samples = torch.zeros(self.N_SAMPLES, dtype=torch.float32, device="cuda")
+        samples[:n].copy_(self.pinned[:n], non_blocking=True)
+
+        stft = torch.stft(
+            samples, self.N_FFT, self.HOP_LENGTH, window=self.window, return_complex=True
+        )
+        magnitudes = stft[..., :-1].abs().pow(2)
+        mel_spec = self.mel_filters @ magnitudes
+
+        log_spec = torch.clamp(mel_spec, min=1e-10).log10()
+        log_spec = torch.maximum(log_spec, log_spec.max() - 8.0)
+        return (log_spec + 4.0) / 4.0
+
+    def transcribe_text(self, audio: np.ndarray) -> str:
+        """Transcribe float32 16kHz mono audio and return the text.
+
+        Audio longer than 30s is split into consecutive 30s windows whose
+        texts are joined, so long finals aren't cut off.
+        """
+        if audio.size <= self.N_SAMPLES:
+            return self._transcribe_window(audio)
+        texts = (
+            self._transcribe_window(audio[start:start + self.N_SAMPLES])
+            for start in range(0, audio.size, self.N_SAMPLES)
+        )
+        return " ".join(t for t in texts if t)
+
+    def _transcribe_window(self, audio: np.ndarray) -> str:
+        """Decode at most 30s of audio."""
+        with torch.no_grad():
+            features = self.log_mel_spectrogram(audio).T.to(torch.float16).contiguous()
+            outputs = self.runner.generate(
+                batch_input_ids=[self.prompt_ids],
+                encoder_input_features=[features],
+                encoder_output_lengths=torch.tensor([self.N_FRAMES // 2], dtype=torch.int32),
+                max_new_tokens=self.max_new_tokens,
+                end_id=self.eot_id,
+                pad_id=self.eot_id,
+                num_beams=1,
+                output_sequence_lengths=True,
+                return_dict=True,
+            )
+            torch.cuda.synchronize()
+
+        length = int(outputs["sequence_lengths"][0][0])
+        output_ids = outputs["output_ids"][0][0][:length].tolist()
+        return self.tokenizer.decode(output_ids, skip_special_tokens=True).strip()
+
+
+if USE_TRT:
+    model = TRTWhisper(TRT_ENGINE_DIR)
+else:
+    # Load model from the path we will pre-download to
+    model = WhisperModel(
+        STT_MODEL,  # Large-model accuracy; int8 keeps latency near small.en
+        device=STT_DEVICE,
+        compute_type=STT_COMPUTE_TYPE,  # int8 weights on INT8 tensor cores, fp16 accumulation
+        download_root="/app/models/whisper",
+    )
+
+# int16 PCM -> [-1, 1) float32 scale, kept as float32 to avoid float64 promotion
+INV_I16_MAX = np.float32(1.0 / 32768.0)
+
+# Buffers below these are answered with empty text without running the model
+SILENCE_RMS = 1e-3
+MIN_SPEECH_SECONDS = 0.3
+
+# Single worker so concurrent clients serialize onto one CUDA context
+STT_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="stt")
 
 
 @app.post("/transcribe")
@@ -32,30 +227,21 @@ async def transcribe(file: UploadFile = File(...)):
     """
     Transcribe audio file using Whisper.
 
-    This endpoint uses a unique temporary file for each request to avoid
-    race conditions with concurrent requests.
+    The upload is decoded in memory and runs through the same executor
+    as the websocket handler, so no temporary file is needed.
     """
-    # Create a unique temp file for this request
-    with tempfile.NamedTemporaryFile(
-        delete=False, suffix=".wav", prefix="stt_"
-    ) as temp_file:
-        temp_path = Path(temp_file.name)
-
     try:
-        # Write uploaded file to temp location
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        # Transcribe with reasonable parameters for speed
-        segments, _ = model.transcribe(
-            str(temp_path),
-            beam_size=1,  # Use greedy decoding for speed
-            vad_filter=False,  # Disable VAD filter as client handles it
-            temperature=0.0,  # More deterministic output
+        data = await file.read()
+
+        # Decode and resample to 16kHz mono float32 without touching disk. The
+        # PyAV decode is CPU-bound, so it runs on the default pool rather than
+        # blocking the event loop or occupying the GPU worker
+        loop = asyncio.get_running_loop()
+        audio = await loop.run_in_executor(
+            None, functools.partial(decode_audio, io.BytesIO(data), sampling_rate=16000)
         )
 
-        # Join segments with proper spacing
-        text = " ".join([s.text for s in segments]).strip()
+        text = await loop.run_in_executor(STT_EXECUTOR, transcribe_audio, audio)
 
         if not text:
             return {"text": ""}
@@ -67,26 +253,99 @@ async def transcribe(file: UploadFile = File(...)):
         print(f"Transcription error: {e}", flush=True)
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
 
-    finally:
-        # Always clean up the temp file
-        try:
-            if temp_path.exists():
-                os.unlink(temp_path)
-        except Exception as e:
-            print(f"Failed to delete temp file {temp_path}: {e}", flush=True)
 
+def pcm16_to_float32(chunks: list, total_samples: int) -> np.ndarray:
+    """Convert int16 PCM chunks into one float32 buffer in a single pass.
+
+    Each chunk is cast and scaled straight into its slice of the output,
+    so no intermediate float32 or division result arrays are created.
+    """
+    audio_buffer = np.empty(total_samples, dtype=np.float32)
+    offset = 0
+    for arr in chunks:
+        n = arr.size
+        np.multiply(arr, INV_I16_MAX, out=audio_buffer[offset:offset + n], dtype=np.float32)
+        offset += n
+    return audio_buffer
+
+
+def tail_to_float32(chunks: list, max_samples: int) -> np.ndarray:
+    """Convert only the most recent max_samples of int16 PCM chunks to float32."""
+    tail = []
+    n = 0
+    for arr in reversed(chunks):
+        tail.append(arr)
+        n += arr.size
+        if n >= max_samples:
+            break
+    tail.reverse()
+    return pcm16_to_float32(tail, n)[-max_samples:]
+
+
+def is_silent(audio_buffer: np.ndarray, sample_rate: int = 16000) -> bool:
+    """Cheap check for buffers too short or too quiet to be worth transcribing."""
+    if audio_buffer.size < MIN_SPEECH_SECONDS * sample_rate:
+        return True
+    rms = np.sqrt(np.dot(audio_buffer, audio_buffer) / audio_buffer.size)
+    return rms < SILENCE_RMS
 
-def transcribe_audio(audio_buffer: np.ndarray) -> str:
+
+def transcribe_audio(audio_buffer: np.ndarray, initial_prompt: Optional[str] = None) -> str:
     """Synchronous transcription function to run in thread."""
+    if USE_TRT:
+        return model.transcribe_text(audio_buffer)
+
     segments, _ = model.transcribe(
         audio_buffer,
         beam_size=1,
         vad_filter=False,
         temperature=0.0,
+        language="en",  # Skip language detection on multilingual models
+        condition_on_previous_text=False,
+        without_timestamps=True,  # No timestamp tokens to decode
+        initial_prompt=initial_prompt or None,
     )
     return " ".join([s.text for s in segments]).strip()
 
 
+async def send_message(websocket: WebSocket, message: dict) -> None:
+    """Send a JSON message as a text frame (same wire format as send_json)."""
+    await websocket.send_text(json_dumps(message))
+
+
+async def send_partial(websocket: WebSocket, audio: np.ndarray, initial_prompt: str) -> None:
+    """Transcribe a rolling window on the STT executor and send it as a partial."""
+    try:
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(STT_EXECUTOR, transcribe_audio, audio, initial_prompt)
+        await send_message(websocket, {"type": "partial", "text": text})
+    except Exception as e:
+        print(f"Partial transcription error: {e}", flush=True)
+
+
+async def receive_loop(websocket: WebSocket, queue: asyncio.Queue) -> None:
+    """Receive websocket frames into the queue so decoding overlaps with I/O.
+
+    A receive error (including WebSocketDisconnect) is queued as the last
+    item and re-raised by the consumer.
+    """
+    try:
+        while True:
+            await queue.put(await websocket.receive_bytes())
+    except Exception as e:
+        await queue.put(e)
+
+
+@app.on_event("startup")
+async def warm_up_model():
+    """Run one silent transcription so CUDA/cuDNN init happens before the first request."""
+    start_time = time.time()
+    warm = np.zeros(16000, dtype=np.float32)
+    # transcribe_audio exhausts the segments generator, so the decoder runs too
+    await asyncio.get_running_loop().run_in_executor(STT_EXECUTOR, transcribe_audio, warm)
+    print(f"[STT] Model warm-up done in {(time.time() - start_time) * 1000:.0f}ms", flush=True)
+
+
 @app.websocket("/ws/transcribe")
 async def websocket_transcribe(websocket: WebSocket):
     """
@@ -95,51 +354,91 @@ async def websocket_transcribe(websocket: WebSocket):
     Protocol:
     - Client sends binary audio chunks (int16 PCM @ 16kHz)
     - Client sends b"END" to signal end of speech
+    - While audio streams in, server sends {"type": "partial", "text": "..."}
+      for roughly every second of audio, covering the last few seconds
     - Server returns {"type": "final", "text": "...", "transcribe_ms": X}
     """
     await websocket.accept()
-    
-    audio_buffer = np.array([], dtype=np.float32)
+    loop = asyncio.get_running_loop()
+
+    chunks: list[np.ndarray] = []
+    total_samples = 0
     SAMPLE_RATE = 16000
     END_SIGNAL = b"END"
+    PARTIAL_STRIDE_SAMPLES = SAMPLE_RATE  # Decode a partial every ~1s of audio
+    PARTIAL_WINDOW_SAMPLES = 5 * SAMPLE_RATE  # over the last ~5s
     total_bytes = 0
+    last_partial_at = 0
+    partial_task: Optional[asyncio.Task] = None
+    last_final_text = ""
+
+    # Bounded so a stalled consumer applies backpressure to the socket
+    queue: asyncio.Queue = asyncio.Queue(maxsize=32)
+    recv_task = asyncio.create_task(receive_loop(websocket, queue))
 
     try:
         while True:
-            data = await websocket.receive_bytes()
+            data = await queue.get()
+            if isinstance(data, Exception):
+                raise data
 
             if data == END_SIGNAL:
+                # Let an in-flight partial land before the final
+                if partial_task is not None and not partial_task.done():
+                    await partial_task
+
+                # Assemble the utterance once instead of growing it per packet
+                audio_buffer = pcm16_to_float32(chunks, total_samples)
+
                 audio_duration = len(audio_buffer) / SAMPLE_RATE
                 start_time = time.time()
                 
                 print(f"[STT] Received {total_bytes} bytes, buffer size: {len(audio_buffer)} samples, {audio_duration:.2f}s", flush=True)
                 
-                if len(audio_buffer) > 0:
+                if not is_silent(audio_buffer, SAMPLE_RATE):
                     try:
-                        loop = asyncio.get_event_loop()
-                        text = await loop.run_in_executor(None, transcribe_audio, audio_buffer)
+                        text = await loop.run_in_executor(STT_EXECUTOR, transcribe_audio, audio_buffer)
                         transcribe_ms = (time.time() - start_time) * 1000
                         print(f"[STT] Done in {transcribe_ms:.0f}ms (RTF: {transcribe_ms/1000/audio_duration:.3f})", flush=True)
-                        await websocket.send_json({"type": "final", "text": text, "transcribe_ms": round(transcribe_ms)})
+                        await send_message(websocket, {"type": "final", "text": text, "transcribe_ms": round(transcribe_ms)})
+                        last_final_text = text
                     except Exception as e:
                         print(f"Transcription error: {e}", flush=True)
-                        await websocket.send_json({"type": "error", "message": str(e)})
+                        await send_message(websocket, {"type": "error", "message": str(e)})
                 else:
-                    await websocket.send_json({"type": "final", "text": ""})
+                    await send_message(websocket, {"type": "final", "text": ""})
 
                 # Reset for next utterance
-                audio_buffer = np.array([], dtype=np.float32)
+                chunks.clear()
+                total_samples = 0
                 total_bytes = 0
+                last_partial_at = 0
+                partial_task = None
             else:
-                # Convert int16 bytes to float32 and append to buffer
-                chunk = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
-                audio_buffer = np.concatenate([audio_buffer, chunk])
+                # Keep raw int16 chunks; the full utterance is converted once at END
+                arr = np.frombuffer(data, dtype=np.int16)
+                chunks.append(arr)
+                total_samples += arr.size
                 total_bytes += len(data)
+
+                # Skip this stride if the previous partial is still decoding
+                if (
+                    total_samples - last_partial_at >= PARTIAL_STRIDE_SAMPLES
+                    and (partial_task is None or partial_task.done())
+                ):
+                    last_partial_at = total_samples
+                    window = tail_to_float32(chunks, PARTIAL_WINDOW_SAMPLES)
+                    # Pauses would only tie up the GPU worker and yield hallucinated text
+                    if not is_silent(window, SAMPLE_RATE):
+                        partial_task = asyncio.create_task(send_partial(websocket, window, last_final_text))
     except WebSocketDisconnect:
         print("WebSocket client disconnected", flush=True)
     except Exception as e:
         print(f"WebSocket error: {e}", flush=True)
     finally:
-        audio_buffer = None
+        recv_task.cancel()
+        if partial_task is not None and not partial_task.done():
+            partial_task.cancel()
+        chunks.clear()
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8881, log_level="info")
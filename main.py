@@ -13,7 +13,6 @@ import sys
 from typing import Optional
 
 from rich.console import Console
-from rich.panel import Panel
 
 from modules.config import Config
 from modules.api_client import RunPodAPIClient, NoInstancesAvailableError
@@ -281,6 +280,8 @@ Examples:
 
     # Default to deploy if no command specified
     if args.command is None:
+        from rich.panel import Panel
+
         console.print(Panel.fit(
             "[bold cyan]Lorel.ai RunPod Setup[/bold cyan]\n\n"
             "[dim]Commands:[/dim]\n"
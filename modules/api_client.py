@@ -1,18 +1,76 @@
 """RunPod API client with REST and GraphQL support."""
 
+import random
+import threading
 import time
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
 
-import requests
 from rich.console import Console
 
+# orjson parses/serializes API payloads much faster; stdlib json keeps the
+# CLI installable without the C extension
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    import json
+
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
 console = Console()
 
 # API endpoints
 REST_BASE_URL = "https://rest.runpod.io/v1"
 GRAPHQL_URL = "https://api.runpod.io/graphql"
 
+# GraphQL documents, kept byte-identical across calls
+GPU_TYPES_QUERY = """
+query {
+    gpuTypes {
+        id
+        displayName
+        memoryInGb
+        secureCloud
+        communityCloud
+        securePrice
+        communityPrice
+        secureSpotPrice
+        communitySpotPrice
+    }
+}
+"""
+
+MY_PODS_PORTS_QUERY = """
+query MyPods {
+  myself {
+    pods {
+      id
+      runtime {
+        ports {
+          privatePort
+          publicPort
+          type
+        }
+      }
+    }
+  }
+}
+"""
+
+MYSELF_QUERY = "query { myself { id } }"
+
+# Upper bound for any single retry wait
+MAX_BACKOFF_SECONDS = 32.0
+
 
 class NoInstancesAvailableError(Exception):
     """Raised when no instances are available for the requested GPU type."""
@@ -20,7 +78,96 @@ class NoInstancesAvailableError(Exception):
 
 
 
-@dataclass
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP-date) into seconds to wait."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _body_snippet(content: Optional[bytes], limit: int = 200) -> str:
+    """Decode only the first bytes of a response body for error messages."""
+    return (content or b"")[:limit].decode("utf-8", "replace")
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter: 0.5x-1.0x of 2**attempt seconds, capped."""
+    base = min(MAX_BACKOFF_SECONDS, 2 ** attempt)
+    return random.uniform(0.5 * base, base)
+
+
+class _TokenBucket:
+    """Adaptive client-side rate limiter.
+
+    429/5xx responses drain the bucket, successes and elapsed time refill it.
+    While it is empty, requests wait locally instead of hitting the API; each
+    waiter reserves a token, so concurrent callers are spaced out rather than
+    all waking at once.
+    """
+
+    def __init__(
+        self,
+        capacity: float = 5.0,
+        refill_rate: float = 0.5,
+        success_credit: float = 0.05,
+        failure_cost: float = 1.0
+    ):
+        self.capacity = capacity
+        self.tokens = capacity
+        self.refill_rate = refill_rate  # tokens per second
+        self.success_credit = success_credit
+        self.failure_cost = failure_cost
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Add tokens for elapsed time. Caller must hold the lock."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last_refill) * self.refill_rate)
+        self._last_refill = now
+
+    def _wait_time(self) -> float:
+        """Seconds until the bucket has tokens again. Caller must hold the lock."""
+        return (1.0 - self.tokens) / self.refill_rate if self.tokens <= 0 else 0.0
+
+    def wait_time(self) -> float:
+        """Seconds the next acquire() would wait, without reserving anything."""
+        with self._lock:
+            self._refill()
+            return self._wait_time()
+
+    def acquire(self) -> None:
+        """Block until the bucket has tokens."""
+        with self._lock:
+            self._refill()
+            wait_time = self._wait_time()
+            if wait_time > 0:
+                # Reserve our slot so the next waiter queues behind us
+                self.tokens -= 1.0
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    def on_response(self, ok: bool) -> None:
+        """Record a response: credit on success, debit on 429/5xx."""
+        with self._lock:
+            self._refill()
+            if ok:
+                self.tokens = min(self.capacity, self.tokens + self.success_credit)
+            else:
+                self.tokens -= self.failure_cost
+
+
+@dataclass(slots=True)
 class GPUInfo:
     """Information about a GPU type."""
     id: str
@@ -34,7 +181,7 @@ class GPUInfo:
     community_cloud: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class Pod:
     """RunPod pod representation."""
     id: str
@@ -44,33 +191,49 @@ class Pod:
     public_ip: Optional[str] = None
     port_mappings: Optional[Dict[str, int]] = None  # {"22": 12345, "8880": 23456}
     gpu: Optional[Dict[str, Any]] = None
+    idempotency_key: Optional[str] = None  # Set for pods created by this client
+    # Resolved once from port_mappings in __post_init__
+    ssh_port: Optional[int] = field(init=False, default=None)
+    api_port: Optional[int] = field(init=False, default=None)
 
-    @property
-    def ssh_port(self) -> Optional[int]:
-        """Get SSH port from port mappings."""
-        if not self.port_mappings:
-            return None
-        port = self.port_mappings.get("22")
-        return int(port) if port else None
+    def __post_init__(self) -> None:
+        self.ssh_port = self._mapped_port("22")
+        self.api_port = self._mapped_port("8880")
 
-    @property
-    def api_port(self) -> Optional[int]:
-        """Get API port (8880) from port mappings."""
+    def _mapped_port(self, private_port: str) -> Optional[int]:
+        """Get the public port mapped to a private port."""
         if not self.port_mappings:
             return None
-        port = self.port_mappings.get("8880")
+        port = self.port_mappings.get(private_port)
         return int(port) if port else None
 
 class RunPodAPIClient:
     """RunPod REST API client with GraphQL support."""
 
     def __init__(self, api_key: str):
+        # requests is imported here so CLI paths that never call the API skip it
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util import Retry
+
         self.api_key = api_key
         self.session = requests.Session()
+        # Kept here so _request can catch it without re-importing per call
+        self._request_exception = requests.exceptions.RequestException
         self.session.headers.update({
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         })
+        # Both hosts share pooled keep-alive connections, so polling loops
+        # reuse TLS sessions. Retries are handled in _request, not by urllib3.
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=Retry(total=0))
+        self.session.mount("https://rest.runpod.io", adapter)
+        self.session.mount("https://api.runpod.io", adapter)
+        self._bucket = _TokenBucket()
+        # (fetched_at, gpu_types) from the last GraphQL gpuTypes query
+        self._gpu_types_cache: Optional[Tuple[float, List[GPUInfo]]] = None
+        self._gpu_types_cache_ttl = 60.0
+        self._gpu_types_lock = threading.Lock()
 
     def _request(
         self,
@@ -78,22 +241,43 @@ class RunPodAPIClient:
         endpoint: str,
         data: Optional[Dict] = None,
         params: Optional[Dict] = None,
-        retry_count: int = 3
+        retry_count: int = 3,
+        headers: Optional[Dict[str, str]] = None
     ) -> Any:
-        """Make API request with retry logic."""
+        """Make API request with retry logic.
+
+        Extra headers (e.g. Idempotency-Key) are sent unchanged on every
+        attempt, so a retried write cannot be applied twice.
+        """
         url = f"{REST_BASE_URL}{endpoint}"
 
         for attempt in range(retry_count):
             try:
+                self._bucket.acquire()
+                body = _json_dumps(data) if data is not None else None
                 response = self.session.request(
-                    method, url, json=data, params=params, timeout=30
+                    method, url, data=body, params=params, headers=headers, timeout=30
                 )
+                self._bucket.on_response(response.status_code != 429 and response.status_code < 500)
 
                 # Handle rate limiting
                 if response.status_code == 429:
-                    wait_time = 2 ** attempt
-                    console.print(f"[yellow]Rate limited, waiting {wait_time}s...[/yellow]")
-                    time.sleep(wait_time)
+                    if attempt == retry_count - 1:
+                        raise RuntimeError(
+                            f"API request failed (429) after {retry_count} attempts: "
+                            f"{_body_snippet(response.content)}"
+                        )
+                    retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                    if retry_after is not None:
+                        wait_time = min(retry_after, MAX_BACKOFF_SECONDS)
+                    else:
+                        wait_time = _backoff_delay(attempt)
+                    console.print(f"[yellow]Rate limited, waiting {wait_time:.1f}s...[/yellow]")
+                    # The drained bucket already delays the next acquire(); only
+                    # sleep for whatever Retry-After/backoff asks beyond that
+                    extra_wait = wait_time - self._bucket.wait_time()
+                    if extra_wait > 0:
+                        time.sleep(extra_wait)
                     continue
 
                 response.raise_for_status()
@@ -102,28 +286,28 @@ class RunPodAPIClient:
                 if response.status_code == 204:
                     return None
 
-                return response.json()
+                return _json_loads(response.content)
 
-            except requests.exceptions.RequestException as e:
+            except self._request_exception as e:
                 # Check for "no instances available" error - don't retry, raise immediately
                 if hasattr(e, 'response') and e.response is not None:
-                    error_body = e.response.text or ""
-                    if "no longer any instances available" in error_body.lower():
+                    content = e.response.content or b""
+                    if b"no longer any instances available" in content.lower():
                         raise NoInstancesAvailableError(
-                            f"No instances available: {error_body[:100]}"
+                            f"No instances available: {_body_snippet(content, 100)}"
                         )
                 
                 # Show more details on final attempt
                 if attempt < retry_count - 1:
                     console.print(f"[yellow]Request failed, retrying... ({attempt + 1}/{retry_count})[/yellow]")
-                    time.sleep(1)
+                    time.sleep(_backoff_delay(attempt))
                     continue
                 
                 # Show detailed error on final failure
                 if hasattr(e, 'response') and e.response is not None:
                     status = e.response.status_code
                     try:
-                        error_body = e.response.text[:200]
+                        error_body = _body_snippet(e.response.content)
                     except:
                         error_body = "Unable to read response"
                     raise RuntimeError(f"API request failed ({status}): {error_body}")
@@ -137,13 +321,15 @@ class RunPodAPIClient:
         if variables:
             payload["variables"] = variables
 
-        response = self.session.post(GRAPHQL_URL, params=params, json=payload, timeout=30)
+        self._bucket.acquire()
+        response = self.session.post(GRAPHQL_URL, params=params, data=_json_dumps(payload), timeout=30)
+        self._bucket.on_response(response.status_code != 429 and response.status_code < 500)
 
         if response.status_code != 200:
-            error_body = response.text[:200] if response.text else "No error body"
+            error_body = _body_snippet(response.content) or "No error body"
             raise RuntimeError(f"GraphQL request failed ({response.status_code}): {error_body}")
 
-        data = response.json()
+        data = _json_loads(response.content)
         if "errors" in data:
             raise RuntimeError(f"GraphQL errors: {data['errors']}")
 
@@ -153,32 +339,31 @@ class RunPodAPIClient:
     def validate_api_key(self) -> bool:
         """Validate API key by making a test request."""
         try:
-            # Try to list pods - this is a simple validation
-            self._request("GET", "/pods", params={"limit": 1})
-            return True
+            # Single lightweight GraphQL call, no pod list and no retry loop
+            data = self._query_graphql(MYSELF_QUERY)
+            myself = (data.get("data") or {}).get("myself") or {}
+            return bool(myself.get("id"))
         except Exception as e:
             console.print(f"[dim]API error: {e}[/dim]")
             return False
 
-    def get_gpu_types(self) -> List[GPUInfo]:
-        """Get available GPU types with pricing from GraphQL."""
-        query = """
-        query {
-            gpuTypes {
-                id
-                displayName
-                memoryInGb
-                secureCloud
-                communityCloud
-                securePrice
-                communityPrice
-                secureSpotPrice
-                communitySpotPrice
-            }
-        }
-        """
+    def get_gpu_types(self, force_refresh: bool = False) -> List[GPUInfo]:
+        """Get available GPU types with pricing from GraphQL.
 
-        data = self._query_graphql(query)
+        Results are cached for 60 seconds; pass force_refresh=True to bypass.
+        """
+        with self._gpu_types_lock:
+            cache = self._gpu_types_cache
+            if not force_refresh and cache and time.monotonic() - cache[0] < self._gpu_types_cache_ttl:
+                return cache[1]
+
+            gpu_types = self._fetch_gpu_types()
+            self._gpu_types_cache = (time.monotonic(), gpu_types)
+            return gpu_types
+
+    def _fetch_gpu_types(self) -> List[GPUInfo]:
+        """Query GPU types from GraphQL (uncached)."""
+        data = self._query_graphql(GPU_TYPES_QUERY)
         gpu_types = data.get("data", {}).get("gpuTypes", [])
 
         return [
@@ -209,9 +394,14 @@ class RunPodAPIClient:
         env: Optional[Dict[str, str]] = None,
         volume_disk_gb: Optional[int] = None,
         network_volume_id: Optional[str] = None,
-        volume_mount_path: str = "/workspace"
+        volume_mount_path: str = "/workspace",
+        idempotency_key: Optional[str] = None
     ) -> Pod:
-        """Create a new pod from Docker image (no template required)."""
+        """Create a new pod from Docker image (no template required).
+
+        A fresh Idempotency-Key is generated unless one is passed in; reuse
+        the key from the returned Pod to safely repeat the same create.
+        """
         if ports is None:
             ports = ["22/tcp", "8880/tcp"]
 
@@ -240,19 +430,29 @@ class RunPodAPIClient:
         if volume_disk_gb is not None or network_volume_id:
             data["volumeMountPath"] = volume_mount_path
 
-        response = self._request("POST", "/pods", data=data)
-        return self._parse_pod(response)
+        if idempotency_key is None:
+            idempotency_key = str(uuid.uuid4())
+
+        response = self._request(
+            "POST", "/pods", data=data, headers={"Idempotency-Key": idempotency_key}
+        )
+        pod = self._parse_pod(response)
+        pod.idempotency_key = idempotency_key
+        return pod
 
     def _parse_pod(self, data: Dict) -> Pod:
         """Parse pod data from API response - matches reference implementation."""
+        get = data.get
+        # Positional in Pod field order: id, name, status, desired_status,
+        # public_ip, port_mappings, gpu
         return Pod(
-            id=data.get("id", ""),
-            name=data.get("name", ""),
-            status=data.get("status", ""),
-            desired_status=data.get("desiredStatus", ""),
-            public_ip=data.get("publicIp"),
-            port_mappings=data.get("portMappings", {}),
-            gpu=data.get("gpu")
+            get("id", ""),
+            get("name", ""),
+            get("status", ""),
+            get("desiredStatus", ""),
+            get("publicIp"),
+            get("portMappings", {}),
+            get("gpu")
         )
 
     def get_pod(self, pod_id: str) -> Pod:
@@ -263,7 +463,7 @@ class RunPodAPIClient:
     def get_pods(self) -> List[Pod]:
         """Get all pods."""
         response = self._request("GET", "/pods")
-        return [self._parse_pod(p) for p in response]
+        return list(map(self._parse_pod, response))
 
     def terminate_pod(self, pod_id: str) -> bool:
         """Terminate a pod."""
@@ -297,25 +497,8 @@ class RunPodAPIClient:
         
         This resolves issues where REST API returns UDP port or has stale data.
         """
-        query = """
-        query MyPods {
-          myself {
-            pods {
-              id
-              runtime {
-                ports {
-                  privatePort
-                  publicPort
-                  type
-                }
-              }
-            }
-          }
-        }
-        """
-        
         try:
-            data = self._query_graphql(query)
+            data = self._query_graphql(MY_PODS_PORTS_QUERY)
             pods = data.get("data", {}).get("myself", {}).get("pods", [])
             
             target_pod = next((p for p in pods if p.get("id") == pod_id), None)
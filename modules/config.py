@@ -1,12 +1,11 @@
 """Configuration management for Lorel.ai RunPod setup."""
 
 import os
+import tempfile
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional, Tuple
 
-from dotenv import load_dotenv
-
 
 @dataclass
 class Config:
@@ -34,20 +33,24 @@ class Config:
 
     def _load_dotenv(self) -> None:
         """Load .env file. Values override shell environment variables."""
+        from dotenv import load_dotenv
+
         load_dotenv(self.env_path, override=True)
 
     def _load_values(self) -> None:
         """Load configuration values from environment."""
-        self.api_key = os.environ.get("RUNPOD_API_KEY", "") or ""
-        self.min_vram_gb = int(os.environ.get("MIN_VRAM_GB", "") or "16")
-        self.max_cost_per_hour = float(os.environ.get("MAX_COST_PER_HOUR", "") or "1.0")
-        self.docker_image = os.environ.get("DOCKER_IMAGE", "") or "kajdo/kokoro-fastapi:latest"
-        self.container_disk_gb = int(os.environ.get("CONTAINER_DISK_GB", "") or "50")
+        env = os.environ
+        self.api_key = env.get("RUNPOD_API_KEY") or ""
+        self.min_vram_gb = int(env.get("MIN_VRAM_GB") or "16")
+        self.max_cost_per_hour = float(env.get("MAX_COST_PER_HOUR") or "1.0")
+        self.docker_image = env.get("DOCKER_IMAGE") or "kajdo/kokoro-fastapi:latest"
+        self.container_disk_gb = int(env.get("CONTAINER_DISK_GB") or "50")
 
-        volume_disk_gb = os.environ.get("VOLUME_DISK_GB")
+        volume_disk_gb = env.get("VOLUME_DISK_GB")
         self.volume_disk_gb = int(volume_disk_gb) if volume_disk_gb else None
-        self.network_volume_id = os.environ.get("NETWORK_VOLUME_ID") or None
-        self.volume_mount_path = os.environ.get("VOLUME_MOUNT_PATH") or "/workspace"
+        self.network_volume_id = env.get("NETWORK_VOLUME_ID") or None
+        self.volume_mount_path = env.get("VOLUME_MOUNT_PATH") or "/workspace"
+
     def validate(self) -> Tuple[bool, str]:
         """Validate configuration and return (is_valid, error_message)."""
         if not self.api_key:
@@ -93,6 +96,18 @@ class Config:
             lines.append(f"NETWORK_VOLUME_ID={self.network_volume_id}")
 
         lines.append(f"VOLUME_MOUNT_PATH={self.volume_mount_path}")
-        
-        with open(self.env_path, "w") as f:
-            f.write("\n".join(lines) + "\n")
\ No newline at end of file
+
+        # Write to a temp file in the same directory and rename over .env, so a
+        # crash never leaves a truncated file holding the API key
+        payload = ("\n".join(lines) + "\n").encode()
+        tmp = tempfile.NamedTemporaryFile("wb", dir=self.env_path.parent, prefix=".env.", delete=False)
+        try:
+            with tmp:
+                tmp.write(payload)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            os.chmod(tmp.name, 0o600)
+            os.replace(tmp.name, self.env_path)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
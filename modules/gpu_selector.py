@@ -1,15 +1,16 @@
 """GPU selection logic for Lorel.ai RunPod setup."""
 
+import heapq
+from operator import attrgetter
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from rich.console import Console
-from rich.table import Table
 
 console = Console()
 
 
-@dataclass
+@dataclass(slots=True)
 class GPUSelection:
     """Result of GPU selection."""
     gpu_type_id: str
@@ -19,6 +20,65 @@ class GPUSelection:
     memory_gb: int
 
 
+def _filter_candidates(
+    gpu_types: List,  # List[GPUInfo] from api_client
+    min_vram_gb: int,
+    max_cost: float,
+    cloud_type: str,
+    is_spot: bool,
+    stats: Optional[Dict[str, int]] = None
+) -> List[Tuple[Any, float]]:
+    """Return (gpu, price) pairs meeting cloud, VRAM and cost limits, unsorted.
+
+    If a stats dict is given, it receives "available" (GPUs offered in the
+    cloud) and "max_vram" (largest VRAM among them) from the same pass.
+    """
+    # Resolve the cloud flag and price field once instead of per GPU
+    prefix = "secure" if cloud_type == "SECURE" else "community"
+    get_cloud = attrgetter(f"{prefix}_cloud")
+    get_price = attrgetter(f"{prefix}_spot_price" if is_spot else f"{prefix}_price")
+
+    candidates = []
+    available = 0
+    max_vram = 0
+
+    for gpu in gpu_types:
+        # Check cloud availability
+        if not get_cloud(gpu):
+            continue
+        available += 1
+        if gpu.memory_in_gb > max_vram:
+            max_vram = gpu.memory_in_gb
+
+        # Check VRAM requirement
+        if gpu.memory_in_gb < min_vram_gb:
+            continue
+
+        # Skip if no price available or over budget
+        price = get_price(gpu)
+        if price is None or price > max_cost:
+            continue
+
+        candidates.append((gpu, price))
+
+    if stats is not None:
+        stats["available"] = available
+        stats["max_vram"] = max_vram
+
+    return candidates
+
+
+def _to_selection(gpu, price: float) -> GPUSelection:
+    """Build a single-GPU selection from a filtered candidate."""
+    return GPUSelection(
+        gpu_type_id=gpu.id,
+        display_name=gpu.display_name,
+        gpu_count=1,
+        cost_per_hour=price,
+        memory_gb=gpu.memory_in_gb
+    )
+
+
 def select_optimal_gpu(
     gpu_types: List,  # List[GPUInfo] from api_client
     min_vram_gb: int,
@@ -38,63 +98,21 @@ def select_optimal_gpu(
     Returns:
         Tuple of (GPUSelection or None, error_message or None)
     """
-    candidates = []
-
-    for gpu in gpu_types:
-        # Check cloud availability
-        if cloud_type == "SECURE" and not gpu.secure_cloud:
-            continue
-        if cloud_type == "COMMUNITY" and not gpu.community_cloud:
-            continue
-
-        # Check VRAM requirement
-        if gpu.memory_in_gb < min_vram_gb:
-            continue
-
-        # Get price based on cloud type and spot flag
-        if cloud_type == "SECURE":
-            price = gpu.secure_spot_price if is_spot else gpu.secure_price
-        else:
-            price = gpu.community_spot_price if is_spot else gpu.community_price
-
-        # Skip if no price available
-        if price is None:
-            continue
-
-        # Check cost constraint
-        if price > max_cost:
-            continue
-
-        candidates.append(GPUSelection(
-            gpu_type_id=gpu.id,
-            display_name=gpu.display_name,
-            gpu_count=1,
-            cost_per_hour=price,
-            memory_gb=gpu.memory_in_gb
-        ))
+    stats: Dict[str, int] = {}
+    candidates = _filter_candidates(gpu_types, min_vram_gb, max_cost, cloud_type, is_spot, stats)
 
     if not candidates:
         # Generate helpful error message
-        available_gpus = [
-            g for g in gpu_types
-            if (cloud_type == "SECURE" and g.secure_cloud) or
-               (cloud_type == "COMMUNITY" and g.community_cloud)
-        ]
-
-        if not available_gpus:
+        if not stats["available"]:
             return None, f"No GPUs available in {cloud_type} cloud."
 
-        vram_filtered = [g for g in available_gpus if g.memory_in_gb >= min_vram_gb]
-        if not vram_filtered:
-            max_vram = max(g.memory_in_gb for g in available_gpus)
-            return None, f"No GPUs with {min_vram_gb}GB VRAM. Max available: {max_vram}GB."
+        if stats["max_vram"] < min_vram_gb:
+            return None, f"No GPUs with {min_vram_gb}GB VRAM. Max available: {stats['max_vram']}GB."
 
         return None, f"No GPUs under ${max_cost}/hour. Try increasing MAX_COST_PER_HOUR."
 
-    # Sort by cost (cheapest first)
-    candidates.sort(key=lambda x: x.cost_per_hour)
-
-    return candidates[0], None
+    # Cheapest candidate
+    return _to_selection(*min(candidates, key=lambda x: x[1])), None
 
 
 def select_all_candidate_gpus(
@@ -119,45 +137,12 @@ def select_all_candidate_gpus(
     Returns:
         List of GPUSelection objects sorted by cost (cheapest first)
     """
-    candidates = []
-
-    for gpu in gpu_types:
-        # Check cloud availability
-        if cloud_type == "SECURE" and not gpu.secure_cloud:
-            continue
-        if cloud_type == "COMMUNITY" and not gpu.community_cloud:
-            continue
-
-        # Check VRAM requirement
-        if gpu.memory_in_gb < min_vram_gb:
-            continue
-
-        # Get price based on cloud type and spot flag
-        if cloud_type == "SECURE":
-            price = gpu.secure_spot_price if is_spot else gpu.secure_price
-        else:
-            price = gpu.community_spot_price if is_spot else gpu.community_price
-
-        # Skip if no price available
-        if price is None:
-            continue
-
-        # Check cost constraint
-        if price > max_cost:
-            continue
-
-        candidates.append(GPUSelection(
-            gpu_type_id=gpu.id,
-            display_name=gpu.display_name,
-            gpu_count=1,
-            cost_per_hour=price,
-            memory_gb=gpu.memory_in_gb
-        ))
+    candidates = _filter_candidates(gpu_types, min_vram_gb, max_cost, cloud_type, is_spot)
 
     # Sort by cost (cheapest first)
-    candidates.sort(key=lambda x: x.cost_per_hour)
+    candidates.sort(key=lambda x: x[1])
 
-    return candidates
+    return [_to_selection(gpu, price) for gpu, price in candidates]
 
 
 def display_gpu_options(
@@ -169,40 +154,18 @@ def display_gpu_options(
     limit: int = 10
 ) -> None:
     """Display available GPU options in a table."""
+    from rich.table import Table
+
     table = Table(title="Available GPUs")
     table.add_column("GPU", style="cyan")
     table.add_column("VRAM", justify="right")
     table.add_column("Price/hr", justify="right")
     table.add_column("Cloud", style="dim")
 
-    candidates = []
-
-    for gpu in gpu_types:
-        # Check cloud availability
-        if cloud_type == "SECURE" and not gpu.secure_cloud:
-            continue
-        if cloud_type == "COMMUNITY" and not gpu.community_cloud:
-            continue
-
-        # Check VRAM requirement
-        if gpu.memory_in_gb < min_vram_gb:
-            continue
-
-        # Get price
-        if cloud_type == "SECURE":
-            price = gpu.secure_spot_price if is_spot else gpu.secure_price
-        else:
-            price = gpu.community_spot_price if is_spot else gpu.community_price
-
-        if price is None or price > max_cost:
-            continue
-
-        candidates.append((gpu, price))
-
-    # Sort by price
-    candidates.sort(key=lambda x: x[1])
+    candidates = _filter_candidates(gpu_types, min_vram_gb, max_cost, cloud_type, is_spot)
 
-    for gpu, price in candidates[:limit]:
+    # Cheapest `limit` candidates, in price order
+    for gpu, price in heapq.nsmallest(limit, candidates, key=lambda x: x[1]):
         table.add_row(
             gpu.display_name,
             f"{gpu.memory_in_gb}GB",
@@ -3,8 +3,7 @@
 from typing import Optional
 
 from rich.console import Console
-from rich.panel import Panel
-from rich.prompt import Prompt
+from rich.text import Text
 
 from .config import Config
 from .api_client import RunPodAPIClient
@@ -12,6 +11,9 @@ from .api_client import RunPodAPIClient
 
 console = Console()
 
+# Client reused across validations of the same key in one session
+_validation_client: Optional[RunPodAPIClient] = None
+
 
 def run_interactive_setup(config: Optional[Config] = None) -> bool:
     """Run interactive setup wizard to create/update .env file.
@@ -19,6 +21,8 @@ def run_interactive_setup(config: Optional[Config] = None) -> bool:
     Returns:
         True if setup completed successfully, False otherwise
     """
+    from rich.panel import Panel
+
     console.clear()
     console.print(Panel.fit(
         "[bold cyan]Lorel.ai RunPod Setup[/bold cyan]"
@@ -118,31 +122,33 @@ def _prompt_with_default(
     required: bool = False
 ) -> str:
     """Prompt user with default value support."""
+    from rich.prompt import Prompt
+
     # Ensure we have a valid default (handle empty strings)
     effective_default = default.strip() if default else ""
     
-    # Build and display prompt with [default] shown in gray
-    if effective_default:
-        # Print prompt line with gray default using Text for proper bracket handling
-        from rich.text import Text
-        prompt_display = Text()
-        prompt_display.append(prompt_text)
-        prompt_display.append(" [")
-        prompt_display.append(effective_default, style="dim")
-        prompt_display.append("]: ")
-        console.print(prompt_display, end="")
-        value = input()
-    else:
-        value = Prompt.ask(prompt_text)
-
-    # Handle empty input - use default if available
-    if not value or not value.strip():
-        if required and not effective_default:
-            console.print("[red]This field is required[/red]")
-            return _prompt_with_default(prompt_text, default, required)
-        return effective_default
-
-    return value.strip()
+    while True:
+        # Build and display prompt with [default] shown in gray
+        if effective_default:
+            # Print prompt line with gray default using Text for proper bracket handling
+            prompt_display = Text()
+            prompt_display.append(prompt_text)
+            prompt_display.append(" [")
+            prompt_display.append(effective_default, style="dim")
+            prompt_display.append("]: ")
+            console.print(prompt_display, end="")
+            value = input()
+        else:
+            value = Prompt.ask(prompt_text)
+
+        # Handle empty input - use default if available
+        if not value or not value.strip():
+            if required and not effective_default:
+                console.print("[red]This field is required[/red]")
+                continue
+            return effective_default
+
+        return value.strip()
 
 def _validate_api_key(api_key: str) -> bool:
     """Validate API key by testing against RunPod API."""
@@ -157,9 +163,16 @@ def _validate_api_key(api_key: str) -> bool:
         console.print("[red]API key should start with 'rpa_'[/red]")
         return False
 
+    # Catch mis-pastes locally before spending a network round-trip
+    if len(api_key) < 32 or not all(c.isalnum() or c == "_" for c in api_key):
+        console.print("[red]API key looks malformed (too short or unexpected characters)[/red]")
+        return False
+
+    global _validation_client
     try:
-        client = RunPodAPIClient(api_key)
-        return client.validate_api_key()
+        if _validation_client is None or _validation_client.api_key != api_key:
+            _validation_client = RunPodAPIClient(api_key)
+        return _validation_client.validate_api_key()
     except Exception as e:
         console.print(f"[red]Validation error: {e}[/red]")
         return False
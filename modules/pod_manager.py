@@ -1,11 +1,10 @@
 """Pod lifecycle management for Lorel.ai RunPod setup."""
 
 import time
-from datetime import datetime
-from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
 
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from .api_client import RunPodAPIClient, Pod
 
@@ -18,6 +17,12 @@ class PodManager:
     def __init__(self, api_client: RunPodAPIClient):
         self.api_client = api_client
         self.current_pod_id: Optional[str] = None
+        # (fetched_at, pods) from the last get_pods call; reused briefly so
+        # back-to-back list/terminate flows don't refetch the same data
+        self._pods_cache: Optional[Tuple[float, List[Pod]]] = None
+        self._pods_cache_ttl = 15.0
+        # SSH ports resolved through the GraphQL fallback; stable once assigned
+        self._ssh_port_cache: Dict[str, int] = {}
 
     def create_pod(
         self,
@@ -32,7 +37,7 @@ class PodManager:
         volume_mount_path: str = "/workspace"
     ) -> Pod:
         """Create a new pod with the specified configuration."""
-        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
         name = f"kokoro-pod-{timestamp}"
 
         env = {}
@@ -73,33 +78,63 @@ class PodManager:
         self,
         pod_id: str,
         timeout: int = 600,
-        poll_interval: int = 5
+        poll_interval: float = 3,
+        max_poll_interval: float = 15
     ) -> Tuple[bool, Optional[Pod]]:
         """Wait for pod to reach RUNNING state with public IP.
 
+        While the pod has no public IP yet (the long startup phase), polling
+        backs off from poll_interval by 1.5x up to max_poll_interval. Once the
+        IP is assigned and only the SSH port is pending, it polls every second.
+
         Returns:
             Tuple of (success, pod or error message)
         """
-        start_time = time.time()
+        from rich.progress import Progress, SpinnerColumn, TextColumn
+
+        deadline = time.monotonic() + timeout
+        # Delay for the next no-IP poll; grows while the pod keeps starting
+        backoff_delay = poll_interval
+        # Once the pod needed the GraphQL SSH-port fallback, fetch it alongside
+        # the REST poll so each tick costs one round-trip instead of two
+        prefetch_ssh_port = False
 
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             console=console
-        ) as progress:
+        ) as progress, ThreadPoolExecutor(max_workers=1) as executor:
             task = progress.add_task("Waiting for pod to start...", total=None)
+            # Only push a description to rich when it actually changes
+            last_desc = None
 
-            while time.time() - start_time < timeout:
+            while time.monotonic() < deadline:
+                delay = backoff_delay
                 try:
+                    ssh_port_future = None
+                    if prefetch_ssh_port and pod_id not in self._ssh_port_cache:
+                        ssh_port_future = executor.submit(
+                            self.api_client.get_pod_ssh_port_from_graphql, pod_id
+                        )
                     pod = self.api_client.get_pod(pod_id)
 
                     if pod.desired_status == "RUNNING" and pod.public_ip:
                         # Try to get SSH port - first from port_mappings, then GraphQL fallback
                         ssh_port = pod.ssh_port
                         if not ssh_port:
-                            ssh_port = self.api_client.get_pod_ssh_port_from_graphql(pod_id)
-                        
+                            ssh_port = self._ssh_port_cache.get(pod_id)
+                        if not ssh_port:
+                            if ssh_port_future is not None:
+                                ssh_port = ssh_port_future.result()
+                            else:
+                                ssh_port = self.api_client.get_pod_ssh_port_from_graphql(pod_id)
+                            prefetch_ssh_port = True
+                            if ssh_port:
+                                self._ssh_port_cache[pod_id] = ssh_port
+
                         if ssh_port and pod.public_ip:
+                            # Callers connect via pod.ssh_port, so carry over the fallback port
+                            pod.ssh_port = ssh_port
                             progress.update(task, description="[green]Pod is running![/green]")
                             return True, pod
 
@@ -115,11 +150,21 @@ class PodManager:
                         status_msg += f" [dim]IP: {pod.public_ip}, checking SSH port...[/dim]"
                     else:
                         status_msg += f" [dim]IP: {pod.public_ip}, SSH: {pod.ssh_port}[/dim]"
-                    progress.update(task, description=status_msg)
+                    if status_msg != last_desc:
+                        progress.update(task, description=status_msg)
+                        last_desc = status_msg
+
+                    if pod.public_ip:
+                        delay = 1
+                    else:
+                        backoff_delay = min(backoff_delay * 1.5, max_poll_interval)
                 except Exception as e:
-                    progress.update(task, description=f"[yellow]Error checking pod status: {e}[/yellow]")
+                    error_msg = f"[yellow]Error checking pod status: {e}[/yellow]"
+                    if error_msg != last_desc:
+                        progress.update(task, description=error_msg)
+                        last_desc = error_msg
 
-                time.sleep(poll_interval)
+                time.sleep(max(0, min(delay, deadline - time.monotonic())))
 
             progress.update(task, description="[red]Timeout waiting for pod to start[/red]")
             return False, None
@@ -134,6 +179,7 @@ class PodManager:
         success = self.api_client.terminate_pod(target_id)
 
         if success:
+            self._pods_cache = None
             console.print("[green]Pod terminated[/green]")
             if target_id == self.current_pod_id:
                 self.current_pod_id = None
@@ -142,25 +188,49 @@ class PodManager:
 
         return success
 
-    def get_running_pods(self) -> list:
-        """Get all running pods."""
-        try:
-            pods = self.api_client.get_pods()
-            return [p for p in pods if p.desired_status == "RUNNING"]
-        except Exception as e:
-            console.print(f"[red]Failed to get pods: {e}[/red]")
-            return []
+    def get_running_pods(self, force_refresh: bool = False) -> list:
+        """Get all running pods.
+
+        The pod list is cached for 15 seconds; if the API call fails, the last
+        cached list is returned with a warning.
+        """
+        cache = self._pods_cache
+        if not force_refresh and cache and time.monotonic() - cache[0] < self._pods_cache_ttl:
+            pods = cache[1]
+        else:
+            try:
+                pods = self.api_client.get_pods()
+                self._pods_cache = (time.monotonic(), pods)
+            except Exception as e:
+                if cache is None:
+                    console.print(f"[red]Failed to get pods: {e}[/red]")
+                    return []
+                age = int(time.monotonic() - cache[0])
+                console.print(f"[yellow]Failed to get pods ({e}); using cached list from {age}s ago[/yellow]")
+                pods = cache[1]
+        return [p for p in pods if p.desired_status == "RUNNING"]
 
     def terminate_all_pods(self) -> int:
         """Terminate all running pods. Returns count of terminated pods."""
         running_pods = self.get_running_pods()
         terminated = 0
-
-        for pod in running_pods:
-            if self.api_client.terminate_pod(pod.id):
-                console.print(f"[green]Terminated: {pod.id} ({pod.name})[/green]")
-                terminated += 1
-            else:
-                console.print(f"[red]Failed to terminate: {pod.id}[/red]")
-
+        if not running_pods:
+            return terminated
+
+        # Each termination is an independent HTTP call, so issue them together
+        with ThreadPoolExecutor(max_workers=min(8, len(running_pods))) as executor:
+            futures = {
+                executor.submit(self.api_client.terminate_pod, pod.id): pod
+                for pod in running_pods
+            }
+            for future in as_completed(futures):
+                pod = futures[future]
+                if future.result():
+                    console.print(f"[green]Terminated: {pod.id} ({pod.name})[/green]")
+                    terminated += 1
+                else:
+                    console.print(f"[red]Failed to terminate: {pod.id}[/red]")
+
+        if terminated:
+            self._pods_cache = None
         return terminated
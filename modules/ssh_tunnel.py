@@ -1,7 +1,18 @@
 """SSH tunnel management for Lorel.ai RunPod setup."""
 
+import asyncio
+import concurrent.futures
+import errno
+import functools
+import importlib.util
 import os
+import select
+import selectors
+import shlex
+import socket
 import subprocess
+import tempfile
+import threading
 import time
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -9,6 +20,175 @@ from rich.console import Console
 
 console = Console()
 
+# Private keys tried in order when no key path is given
+_SSH_KEY_CANDIDATES = tuple(
+    os.path.expanduser(p) for p in ("~/.ssh/id_ed25519", "~/.ssh/id_rsa", "~/.ssh/id_ecdsa")
+)
+
+
+class _AsyncSSHTunnel:
+    """All port forwards over one asyncssh connection.
+
+    The connection runs on a private event loop in a daemon thread and the
+    object exposes the Popen-style poll/wait/terminate/kill used by SSHTunnel,
+    so it can sit in SSHTunnel.processes next to subprocess handles.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        key_path: str,
+        tunnels: List[Dict],
+        bind_addr: str,
+        connect_timeout: float = 60
+    ):
+        self.pid = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+        # The overall timeout (connect retries plus the login itself) is applied
+        # inside the loop, so a timed-out _open is cancelled and has closed any
+        # half-open connection before result() returns
+        opener = asyncio.wait_for(
+            self._open(host, port, username, key_path, tunnels, bind_addr, connect_timeout),
+            connect_timeout + 30
+        )
+        try:
+            self._conn = asyncio.run_coroutine_threadsafe(opener, self._loop).result()
+        except BaseException:
+            self._shutdown_loop()
+            raise
+
+        self._closed = asyncio.run_coroutine_threadsafe(self._conn.wait_closed(), self._loop)
+
+    @staticmethod
+    async def _open(host, port, username, key_path, tunnels, bind_addr, connect_timeout):
+        import asyncssh
+
+        # Retry like ssh's ConnectionAttempts: a pod that just turned RUNNING
+        # may not have sshd accepting connections yet
+        deadline = time.monotonic() + connect_timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                conn = await asyncssh.connect(
+                    host,
+                    port=port,
+                    username=username,
+                    client_keys=[key_path],
+                    # A passphrase-protected key file is skipped; ssh-agent may hold it
+                    ignore_encrypted=True,
+                    agent_path=os.environ.get("SSH_AUTH_SOCK", ""),
+                    known_hosts=None,  # Same as StrictHostKeyChecking=no for fresh pods
+                    keepalive_interval=30,
+                    keepalive_count_max=3,
+                    # Bound each attempt so a black-holed host still gets retried
+                    connect_timeout=max(1.0, min(10.0, remaining))
+                )
+                break
+            except (OSError, asyncio.TimeoutError, asyncssh.ConnectionLost):
+                if time.monotonic() >= deadline:
+                    raise
+                await asyncio.sleep(1)
+        try:
+            await asyncio.gather(*[
+                conn.forward_local_port(bind_addr, t["local"], "127.0.0.1", t["remote"])
+                for t in tunnels
+            ])
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def _shutdown_loop(self) -> None:
+        """Stop the private event loop, join its thread and close it."""
+        if self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+        if not self._thread.is_alive():
+            self._loop.close()
+
+    def poll(self) -> Optional[int]:
+        """Return 0 once the connection has closed, None while it is up."""
+        return 0 if self._closed.done() else None
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        """Block until the connection closes."""
+        try:
+            self._closed.result(timeout)
+        except concurrent.futures.TimeoutError:
+            raise subprocess.TimeoutExpired("asyncssh", timeout)
+        self._shutdown_loop()
+        return 0
+
+    def terminate(self) -> None:
+        """Close the connection and all of its forwards."""
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._conn.close)
+
+    def kill(self) -> None:
+        self.terminate()
+        try:
+            self._closed.result(1)
+        except (concurrent.futures.TimeoutError, concurrent.futures.CancelledError):
+            pass
+        self._shutdown_loop()
+
+
+class _TunnelProc:
+    """Uniform handle over a tunnel process.
+
+    Wraps a Popen-style handle (subprocess.Popen, _AsyncSSHTunnel) or a
+    pexpect.spawn; which one is decided once here rather than with hasattr
+    checks on every wait/stop.
+    """
+
+    __slots__ = ('proc', 'is_pexpect')
+
+    def __init__(self, proc: Any):
+        self.proc = proc
+        self.is_pexpect = not hasattr(proc, 'poll')
+
+    @property
+    def pid(self) -> Optional[int]:
+        return getattr(self.proc, 'pid', None)
+
+    def is_alive(self) -> bool:
+        if self.is_pexpect:
+            return self.proc.isalive()
+        return self.proc.poll() is None
+
+    def wait(self) -> None:
+        if self.is_pexpect:
+            import pexpect
+            try:
+                self.proc.expect(pexpect.EOF, timeout=None)
+            except (pexpect.EOF, pexpect.TIMEOUT):
+                pass
+        else:
+            self.proc.wait()
+
+    def stop(self) -> None:
+        """Terminate, escalating to kill if it does not exit within 5s."""
+        if self.is_pexpect:
+            self.proc.close(force=True)
+            return
+        try:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        except Exception:
+            try:
+                self.proc.kill()
+            except Exception:
+                pass
+
 
 class SSHTunnel:
     """Manages SSH tunnels for accessing pod services."""
@@ -24,7 +204,12 @@ class SSHTunnel:
         self.ssh_port = ssh_port
         self.username = username
         self.ssh_key_path = ssh_key_path or self.find_ssh_key()
-        self.processes: List[Any] = []
+        self.processes: List[_TunnelProc] = []
+        # Multiplexing socket; the tunnel process is the master, so later ssh
+        # sessions to the pod can attach without a new handshake
+        self.control_path = os.path.expanduser(
+            f"~/.ssh/lorel-cm-{self.username}@{self.pod_ip}:{self.ssh_port}"
+        )
 
         # Tunnel configuration
         self.tunnels = [
@@ -33,30 +218,52 @@ class SSHTunnel:
             {"local": 2222, "remote": 22, "name": "SSH"}
         ]
 
+        # Multiplexing options; cleared by start_tunnels if ~/.ssh is unusable
+        self._control_ssh_opts: Tuple[str, ...] = (
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath={self.control_path}",
+            # Keep the master in the foreground so poll()/wait() track the tunnel
+            "-o", "ControlPersist=no",
+        )
+
+        # Everything after the -L forwards is the same for every bind attempt
+        # (same order as reference; key at the END)
+        self._static_ssh_opts: Tuple[str, ...] = (
+            "-o", "ServerAliveInterval=30",
+            "-o", "ServerAliveCountMax=3",
+            "-o", "TCPKeepAlive=yes",
+            "-o", "ExitOnForwardFailure=yes",
+            "-o", "StrictHostKeyChecking=no",
+            "-o", "UserKnownHostsFile=/dev/null",
+            "-o", "ConnectionAttempts=60",
+            "-N",
+            "-T",
+            f"{self.username}@{self.pod_ip}",
+            "-p", str(self.ssh_port),
+            *(("-i", self.ssh_key_path) if self.ssh_key_path else ())
+        )
+
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def detect_local_ip() -> str:
-        """Detect best local IP for binding. Try 0.0.0.0, fallback to 127.0.0.1."""
+        """Detect best local IP for binding. Try 0.0.0.0, fallback to 127.0.0.1.
+
+        Probed once per process; the answer doesn't change between retries.
+        """
         # Try to bind to 0.0.0.0 for network-wide access
         try:
-            import socket
-            test_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            test_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            test_socket.bind(("0.0.0.0", 9999))
-            test_socket.close()
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP) as test_socket:
+                test_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                test_socket.bind(("0.0.0.0", 9999))
             return "0.0.0.0"
         except Exception:
             return "127.0.0.1"
 
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def find_ssh_key() -> Optional[str]:
-        """Find available SSH key."""
-        key_paths = [
-            os.path.expanduser("~/.ssh/id_ed25519"),
-            os.path.expanduser("~/.ssh/id_rsa"),
-            os.path.expanduser("~/.ssh/id_ecdsa"),
-        ]
-
-        for path in key_paths:
+        """Find available SSH key (looked up once per process)."""
+        for path in _SSH_KEY_CANDIDATES:
             if os.path.exists(path):
                 return path
 
@@ -64,10 +271,7 @@ class SSHTunnel:
 
     def _build_ssh_command(self, tunnels: List[Dict], bind_addr: str) -> List[str]:
         """Build SSH command for tunnel creation - matches reference implementation."""
-        ssh_cmd = [
-            "ssh",
-            "-4",
-        ]
+        ssh_cmd = ["ssh", "-4"]
 
         # Add tunnel options
         for tunnel in tunnels:
@@ -75,54 +279,112 @@ class SSHTunnel:
                 "-L", f"{bind_addr}:{tunnel['local']}:127.0.0.1:{tunnel['remote']}"
             ])
 
-        # Add SSH options (same order as reference)
-        ssh_cmd.extend([
-            "-o", "ServerAliveInterval=30",
-            "-o", "ServerAliveCountMax=3",
-            "-o", "TCPKeepAlive=yes",
-            "-o", "ExitOnForwardFailure=yes",
-            "-o", "StrictHostKeyChecking=no",
-            "-o", "UserKnownHostsFile=/dev/null",
-            "-o", "ConnectionAttempts=60",
-            "-N",
-            "-T",
-            f"{self.username}@{self.pod_ip}",
-            "-p", str(self.ssh_port)
-        ])
+        ssh_cmd.extend(self._control_ssh_opts)
+        ssh_cmd.extend(self._static_ssh_opts)
+        return ssh_cmd
 
-        # Add key at the END (matches reference)
-        if self.ssh_key_path:
-            ssh_cmd.extend(["-i", self.ssh_key_path])
+    def _create_tunnel_with_key(
+        self,
+        ssh_cmd: List[str],
+        startup_timeout: float = 10
+    ) -> subprocess.Popen:
+        """Create SSH tunnel using key authentication.
 
-        return ssh_cmd
-    def _create_tunnel_with_key(self, ssh_cmd: List[str]) -> subprocess.Popen:
-        """Create SSH tunnel using key authentication."""
+        Returns once every forwarded port accepts connections, or after
+        startup_timeout if ssh is still running but not all ports are up.
+        """
         console.print("[dim]Starting tunnel with SSH key...[/dim]")
-        console.print(f"[dim]Command: {' '.join(ssh_cmd)}[/dim]")
+        console.print(f"[dim]Command: {shlex.join(ssh_cmd)}[/dim]")
 
+        # ssh's stderr goes to an anonymous temp file rather than a pipe: nothing
+        # drains a pipe once the tunnel is up, and a full one would stall ssh
+        stderr_file = tempfile.TemporaryFile()
         try:
             process = subprocess.Popen(
                 ssh_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=stderr_file,
                 stdin=subprocess.PIPE
             )
 
-            # Give it a moment to start
-            time.sleep(3)
-
-            # Check if process exited immediately
-            if process.poll() is not None:
-                _, stderr = process.communicate()
-                stderr_text = stderr.decode('utf-8', errors='ignore')
-                console.print(f"[red]SSH stderr: {stderr_text}[/red]")
-                raise RuntimeError(f"SSH process exited immediately (code {process.poll()}): {stderr_text}")
+            # Wait until the forwards are up rather than for a fixed delay
+            ports = [t['local'] for t in self.tunnels]
+            deadline = time.monotonic() + startup_timeout
+            while True:
+                if process.poll() is not None:
+                    stderr_file.seek(0)
+                    stderr_text = stderr_file.read().decode('utf-8', errors='ignore')
+                    console.print(f"[red]SSH stderr: {stderr_text}[/red]")
+                    raise RuntimeError(f"SSH process exited immediately (code {process.poll()}): {stderr_text}")
+                if all(self._probe_local_ports(ports, timeout=0.1).values()):
+                    break
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(0.1)
 
             console.print(f"[green]SSH tunnel process started (PID: {process.pid})[/green]")
             return process
 
         except Exception as e:
             raise RuntimeError(f"Failed to create SSH tunnel: {e}")
+        finally:
+            stderr_file.close()
+
+    def _create_tunnel_with_asyncssh(self, bind_addr: str) -> _AsyncSSHTunnel:
+        """Create all tunnels over a single asyncssh connection.
+
+        Authentication and bind failures raise here, so no startup delay is
+        needed to detect an early exit.
+        """
+        console.print("[dim]Starting tunnel with SSH key (asyncssh)...[/dim]")
+        try:
+            tunnel = _AsyncSSHTunnel(
+                self.pod_ip,
+                self.ssh_port,
+                self.username,
+                self.ssh_key_path,
+                self.tunnels,
+                bind_addr
+            )
+        except Exception as e:
+            # Timeouts carry no message of their own
+            raise RuntimeError(f"Failed to create SSH tunnel: {e or type(e).__name__}")
+
+        console.print("[green]SSH tunnel connection established[/green]")
+        return tunnel
+
+    @staticmethod
+    def _probe_local_ports(ports: List[int], timeout: float = 1.0) -> Dict[int, bool]:
+        """Check which local ports accept connections.
+
+        All connects are started non-blocking and awaited with a single
+        select, so the probe takes at most `timeout` regardless of port count.
+        """
+        ready = {port: False for port in ports}
+        pending = {}
+        try:
+            for port in ports:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setblocking(False)
+                result = sock.connect_ex(('127.0.0.1', port))
+                if result == 0:
+                    ready[port] = True
+                    sock.close()
+                elif result in (errno.EINPROGRESS, errno.EWOULDBLOCK):
+                    pending[sock] = port
+                else:
+                    sock.close()
+
+            if pending:
+                _, writable, _ = select.select([], list(pending), [], timeout)
+                for sock in writable:
+                    if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                        ready[pending[sock]] = True
+        finally:
+            for sock in pending:
+                sock.close()
+
+        return ready
 
     def start_tunnels(self) -> Tuple[bool, str, str]:
         """Start SSH tunnels.
@@ -135,47 +397,61 @@ class SSHTunnel:
         if not self.ssh_key_path:
             return False, "SSH key not found. Please set up SSH keys for authentication.", local_ip
 
+        # The startup wait treats a listening port as our forward being up, so
+        # anything already on these ports would pass it before ssh fails to bind
+        in_use = [port for port, busy in self._probe_local_ports(
+            [t['local'] for t in self.tunnels]
+        ).items() if busy]
+        if in_use:
+            ports = ", ".join(str(port) for port in in_use)
+            return False, f"Local port(s) {ports} already in use; stop whatever is listening there", local_ip
+
         console.print(f"[dim]Connecting to {self.username}@{self.pod_ip}:{self.ssh_port}[/dim]")
         console.print(f"[dim]Auth: SSH key: {self.ssh_key_path}[/dim]")
 
+        # ControlPath lives in ~/.ssh, which may not exist yet. If it can't be
+        # created (read-only HOME), tunnel without multiplexing instead of failing
+        try:
+            os.makedirs(os.path.dirname(self.control_path), mode=0o700, exist_ok=True)
+        except OSError as e:
+            console.print(f"[yellow]SSH connection multiplexing disabled: {e}[/yellow]")
+            self._control_ssh_opts = ()
+
+        # asyncssh is optional and imported only once a tunnel is actually started
+        use_asyncssh = importlib.util.find_spec("asyncssh") is not None
+
         for bind_addr in [local_ip, "127.0.0.1"]:
             try:
                 console.print(f"[dim]Trying to bind to {bind_addr}...[/dim]")
-                ssh_cmd = self._build_ssh_command(self.tunnels, bind_addr)
-
-                process = self._create_tunnel_with_key(ssh_cmd)
-                self.processes.append(process)
+                process = None
+                if use_asyncssh:
+                    try:
+                        process = self._create_tunnel_with_asyncssh(bind_addr)
+                    except RuntimeError as e:
+                        # e.g. a key only usable via passphrase prompt; the ssh
+                        # binary handles everything asyncssh can't
+                        console.print(f"[yellow]{e}; falling back to ssh[/yellow]")
+                        use_asyncssh = False
+                if process is None:
+                    ssh_cmd = self._build_ssh_command(self.tunnels, bind_addr)
+                    process = self._create_tunnel_with_key(ssh_cmd)
+                tunnel_proc = _TunnelProc(process)
+                self.processes.append(tunnel_proc)
 
                 # Verify process is still alive
-                time.sleep(2)
-                is_alive = True
-                
-                if hasattr(process, 'poll'):  # subprocess.Popen
-                    if process.poll() is not None:
-                        is_alive = False
-                elif callable(getattr(process, 'isalive', None)):  # pexpect.spawn
-                    if not process.isalive():  # type: ignore
-                        is_alive = False
-                
-                if not is_alive:
+                if not tunnel_proc.is_alive():
                     self.stop_all()
                     continue
-                
+
                 # Verify ports are actually listening
-                import socket
+                ready = self._probe_local_ports([t['local'] for t in self.tunnels])
                 ports_ready = True
                 for tunnel in self.tunnels:
-                    test_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    try:
-                        test_socket.settimeout(1)
-                        result = test_socket.connect_ex(('127.0.0.1', tunnel['local']))
-                        if result == 0:
-                            console.print(f"[green]Port {tunnel['local']} is listening ✓[/green]")
-                        else:
-                            console.print(f"[yellow]Port {tunnel['local']} not yet ready...[/yellow]")
-                            ports_ready = False
-                    finally:
-                        test_socket.close()
+                    if ready[tunnel['local']]:
+                        console.print(f"[green]Port {tunnel['local']} is listening ✓[/green]")
+                    else:
+                        console.print(f"[yellow]Port {tunnel['local']} not yet ready...[/yellow]")
+                        ports_ready = False
                 
                 if not ports_ready:
                     self.stop_all()
@@ -237,19 +513,47 @@ class SSHTunnel:
         console.print("[dim]Tunnels active. Press Ctrl+C to stop.[/dim]")
 
         try:
+            if self._wait_for_first_exit():
+                console.print("[yellow]SSH tunnel process exited[/yellow]")
+                return
+
             for process in self.processes:
-                if hasattr(process, 'wait'):
-                    process.wait()
-                elif hasattr(process, 'expect'):
-                    import pexpect
-                    try:
-                        process.expect(pexpect.EOF, timeout=None)
-                    except (pexpect.EOF, pexpect.TIMEOUT):
-                        pass
+                process.wait()
         except KeyboardInterrupt:
             console.print("\n[dim]Received interrupt signal...[/dim]")
             raise
 
+    def _wait_for_first_exit(self) -> bool:
+        """Block until any tunnel process exits, using one pidfd per process.
+
+        Returns False without waiting when pidfds are unavailable or a handle
+        has no pid (asyncssh), so the caller can fall back to waiting in turn.
+        """
+        if not hasattr(os, "pidfd_open"):
+            return False
+        pids = [process.pid for process in self.processes]
+        if None in pids:
+            return False
+
+        pidfds = []
+        try:
+            with selectors.DefaultSelector() as selector:
+                for pid in pids:
+                    pidfd = os.pidfd_open(pid)
+                    pidfds.append(pidfd)
+                    selector.register(pidfd, selectors.EVENT_READ)
+                selector.select()
+        except ProcessLookupError:
+            # Already exited and reaped
+            pass
+        except OSError:
+            return False
+        finally:
+            for pidfd in pidfds:
+                os.close(pidfd)
+
+        return True
+
     def stop_all(self) -> None:
         """Stop all tunnel processes."""
         if not self.processes:
@@ -259,20 +563,30 @@ class SSHTunnel:
 
         for process in self.processes:
             try:
-                if hasattr(process, 'terminate'):
-                    process.terminate()
-                    try:
-                        process.wait(timeout=5)
-                    except subprocess.TimeoutExpired:
-                        process.kill()
-                elif hasattr(process, 'close'):
-                    process.close()
+                process.stop()
             except Exception:
-                try:
-                    if hasattr(process, 'kill'):
-                        process.kill()
-                except Exception:
-                    pass
+                pass
 
         self.processes.clear()
+        self._close_control_master()
         console.print("[green]Tunnels stopped[/green]")
+
+    def _close_control_master(self) -> None:
+        """Ask a still-running multiplexing master to exit and drop its socket."""
+        if not os.path.exists(self.control_path):
+            return
+
+        try:
+            subprocess.run(
+                [
+                    "ssh", "-O", "exit",
+                    "-o", f"ControlPath={self.control_path}",
+                    "-p", str(self.ssh_port),
+                    f"{self.username}@{self.pod_ip}"
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=5
+            )
+        except Exception:
+            pass